@@ -12,19 +12,20 @@
 # Import Statements
 # ----------------------------------------------------------------------------------------------------------------------
 from datetime import datetime
+from functools import cached_property
 from glob import glob
 import hashlib
 import json
 import logging
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import time
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 import uuid
 
-import jsonschema
 from rich import print, box
 from rich.console import group
 from rich.panel import Panel
@@ -33,6 +34,7 @@ from rich.tree import Tree
 import yaml
 
 from b import exceptions, migrations
+from b import presenters  # Registers the multiline string presenter used for every bug file written.
 
 
 
@@ -55,7 +57,17 @@ class Tracker:
         self.user = user
         self.editor = editor
         self.logger = logging.getLogger('tracker')
+        self._bugsdir = os.path.expanduser(bugsdir)
 
+
+# ----------------------------------------------------------------------------------------------------------------------
+    @cached_property
+    def bugsdir(self) -> str:
+        """The path to the bugs directory.
+
+        Relative paths are searched for from the current working directory up, which is deferred until the directory is
+        first needed so that commands which never touch the bugs don't pay for walking the tree.
+        """
         def climb_tree(reference) -> str:
             working = os.getcwd()
             while True:
@@ -70,21 +82,31 @@ class Tracker:
                     return reference
                 working = new
 
-        bugsdir = os.path.expanduser(bugsdir)
-        self.bugsdir = bugsdir if os.path.isabs(os.path.expanduser(bugsdir)) else climb_tree(bugsdir)
-        self.logger.info('Bugs directory: %s', self.bugsdir)
+        bugsdir = self._bugsdir if os.path.isabs(self._bugsdir) else climb_tree(self._bugsdir)
+        self.logger.info('Bugs directory: %s', bugsdir)
+        return bugsdir
 
 
 # ----------------------------------------------------------------------------------------------------------------------
-    def _get_bug(self, prefix: str) -> Dict[str, any]:
+    def _load_bug(self, full_id: str) -> Dict[str, any]:
+        """Read the bug identified by the complete `full_id` from its YAML file."""
+        with open(self._get_bug_path(full_id), 'r') as handle:
+            data = yaml.safe_load(handle)
+        data['id'] = full_id
+        return data
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+    def _resolve_id(self, prefix: str) -> str:
+        """Return the complete ID of the single bug matching `prefix` without reading any of the bug files."""
+        # Try a complete ID first.
+        if os.path.basename(prefix) == prefix and os.path.isfile(self._get_bug_path(prefix)):
+            return prefix
+
         ids = self._list_ids()
         matched = [id for id in ids if id.startswith(prefix)]
         if len(matched) == 1:
-            id = matched[0]
-            with open(self._get_bug_path(id), 'r') as handle:
-                data = yaml.safe_load(handle)
-            data['id'] = id
-            return data
+            return matched[0]
 
         elif len(matched) == 0:
             raise exceptions.UnknownPrefix(prefix)
@@ -95,22 +117,20 @@ class Tracker:
 
 
 # ----------------------------------------------------------------------------------------------------------------------
-    def _all_bugs(self) -> List[Dict[str, any]]:
-        return [self._get_bug(id) for id in self._list_ids()]
+    def _get_bug(self, prefix: str) -> Dict[str, any]:
+        return self._load_bug(self._resolve_id(prefix))
 
 
 # ----------------------------------------------------------------------------------------------------------------------
-    def _write(self, bug: Dict[str, any]):
-        """Flush the finished and unfinished tasks to the files on disk."""
-        if not os.path.exists(self.bugsdir):
-            raise exceptions.NotInitialized('No bugs directory found for the current directory')
+    def _all_bugs(self) -> Iterator[Dict[str, any]]:
+        # Load each bug lazily, straight from the listed IDs.
+        for id in self._list_ids():
+            yield self._load_bug(id)
 
-        def str_presenter(dumper, data):
-            if len(data.splitlines()) > 1:  # check for multiline string
-                return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
-            return dumper.represent_scalar('tag:yaml.org,2002:str', data)
-        yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
 
+# ----------------------------------------------------------------------------------------------------------------------
+    def _write(self, bug: Dict[str, any]):
+        """Flush the finished and unfinished tasks to the files on disk."""
         # Start with a list of keys from the schema sorted in our preferred order.
         keys = [
             'title',
@@ -147,10 +167,17 @@ class Tracker:
         # In newer Python, the dicts are automatically OrderedDict's.
         sorted = dict((key, bug.get(key)) for key in keys if key in bug)
 
+        # Render the complete YAML document up front so the file is written with a single call and isn't left
+        # truncated should the dump fail part way through.
+        contents = yaml.safe_dump(sorted, sort_keys=False)
+
         # Finally, write the now sorted bug contents to disc.
         filename = self._get_bug_path(bug['id'])
-        with open(filename, 'w') as handle:
-            yaml.safe_dump(sorted, handle, sort_keys=False)
+        try:
+            with open(filename, 'w') as handle:
+                handle.write(contents)
+        except FileNotFoundError as error:
+            raise exceptions.NotInitialized('No bugs directory found for the current directory') from error
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -161,23 +188,36 @@ class Tracker:
 
 # ----------------------------------------------------------------------------------------------------------------------
     def _list_ids(self) -> List[str]:
-        return [file.split('.', 1)[0] for file in os.listdir(self.bugsdir) if file.endswith('.bug.yaml')]
+        try:
+            files = os.listdir(self.bugsdir)
+        except FileNotFoundError as error:
+            raise exceptions.NotInitialized('No bugs directory found - use `init` command first') from error
+        return [file.split('.', 1)[0] for file in files if file.endswith('.bug.yaml')]
 
 
 # ----------------------------------------------------------------------------------------------------------------------
     def prefixes(self) -> Dict[str, str]:
+        """Return a mapping of each bug ID to the shortest prefix which uniquely identifies it.
+
+        Once the IDs are sorted, the ones sharing the longest common prefix with any given ID are its immediate
+        neighbors, so only those need to be compared rather than every other ID.
+        """
+        ids = sorted(self._list_ids())
         prefixes = {}
-        ids = self._list_ids()
-        for id in ids:
-            for idx in range(1, len(id)):
-                prefix = id[:idx]
-                matches = [id for id in ids if id.startswith(prefix)]
-                if len(matches) == 1:
-                    prefixes[id] = prefix
-                    break
+        for idx, id in enumerate(ids):
+            neighbors = ids[max(idx - 1, 0):idx] + ids[idx + 1:idx + 2]
+            prefixes[id] = self._unique_prefix(id, neighbors)
         return prefixes
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _unique_prefix(full_id: str, others: Iterable[str]) -> str:
+        """Return the shortest prefix of `full_id` which is not also a prefix of any of the `others`."""
+        common = max((len(os.path.commonprefix([full_id, other])) for other in others), default=0)
+        return full_id[:common + 1]
+
+
 # ----------------------------------------------------------------------------------------------------------------------
     def _users_list(self, scope: str = 'open'):
         """Returns a mapping of usernames to the number of open bugs assigned to that user."""
@@ -191,7 +231,7 @@ class Tracker:
             if owner not in bugs:
                 bugs[owner] = []
             bugs[owner].append(bug)
-        return dict(sorted(list(bugs.items()), key=lambda attrs: len(attrs[1]), reverse=True))
+        return dict(sorted(bugs.items(), key=lambda attrs: len(attrs[1]), reverse=True))
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -236,7 +276,20 @@ class Tracker:
         Arguments:
             path: The path to the file to be edited.
         """
-        subprocess.call("%s \"%s\"" % (self.editor, path), shell=True)
+        # Windows editors are commonly batch file shims (`code.cmd` for instance) which only the shell knows how to run.
+        if os.name == 'nt':
+            subprocess.call(f'{self.editor} "{path}"', shell=True)
+            return
+
+        # Elsewhere, expand variables and the home directory and split out any arguments like the shell would, then run
+        # the editor directly.
+        command = [os.path.expanduser(arg) for arg in shlex.split(os.path.expandvars(self.editor))]
+        if not command:
+            raise exceptions.EditorError(self.editor)
+        try:
+            subprocess.call([*command, path])
+        except OSError as error:
+            raise exceptions.EditorError(self.editor) from error
 
 
 
@@ -274,13 +327,14 @@ class Tracker:
         templates = {}
 
         def add_templates(base):
-            directory = os.path.join(base, 'templates')
-            if not os.path.exists(directory):
+            try:
+                entries = os.scandir(os.path.join(base, 'templates'))
+            except FileNotFoundError:
                 return
-            for template in os.listdir(directory):
-                path = os.path.join(directory, template)
-                name = template.rsplit('.', 2)[0]
-                templates[name] = path
+            with entries:
+                for entry in entries:
+                    if entry.is_file():
+                        templates[entry.name.rsplit('.', 2)[0]] = entry.path
 
         # Start with a list of templates from the template folder within this `b` package.
         if not only_custom:
@@ -288,7 +342,7 @@ class Tracker:
 
         # Include/override with templates from the project directory when specified.
         if not only_defaults:
-            add_templates(os.path.expanduser(str(self.bugsdir)))
+            add_templates(self.bugsdir)
 
         return templates
 
@@ -303,7 +357,7 @@ class Tracker:
             message += '\nInvoke `b templates -d` for a list of templates available for customization.'
             raise exceptions.InvalidInput(message)
         source = available[template]
-        destination_dir = os.path.join(os.path.expanduser(str(self.bugsdir)), 'templates')
+        destination_dir = os.path.join(self.bugsdir, 'templates')
         destination = os.path.join(destination_dir, os.path.basename(source))
         if os.path.exists(destination):
             raise exceptions.InvalidCommand(f'The specified template "{template}" already exists at {destination}.')
@@ -329,7 +383,7 @@ class Tracker:
 # ----------------------------------------------------------------------------------------------------------------------
     def id(self, prefix):
         """Given a prefix, returns the full id of that bug."""
-        print(self._get_bug(prefix)['id'])
+        print(self._resolve_id(prefix))
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -355,12 +409,18 @@ class Tracker:
             bug = yaml.safe_load(handle)
 
         # Generate a unique hash for a new ID.
-        existing = self._list_ids()
+        existing = set(self._list_ids())
+        node = str(uuid.getnode()).encode('utf-8')
+        now = time.time_ns()
+        stamp = now
         while True:
             # Generate a hash using the system MAC address and the current timestamp.  This may not be collision-proof,
             # but odds of a duplicate hash should be extremely low.  This is important as the hashes must be universally
-            # unique for the distributed nature of b to work.
-            full_id = hashlib.sha1((str(time.time()) + str(uuid.getnode())).encode('utf-8')).hexdigest()
+            # unique for the distributed nature of b to work.  A 20 byte BLAKE2b digest keeps IDs the same length as
+            # the SHA-1 IDs of existing bugs while being cheaper to compute.
+            digest = hashlib.blake2b(stamp.to_bytes(8, 'little'), digest_size=20)
+            digest.update(node)
+            full_id = digest.hexdigest()
 
             # It should also mean that local collisions are nearly impossible too, however we can make absolutely
             # certain that we never locally duplicate an ID with a simple check.
@@ -368,10 +428,13 @@ class Tracker:
                 # Break the loop if this ID is unique.
                 break
 
+            # Step the timestamp rather than waiting on the clock so that a retry always produces a different hash.
+            stamp += 1
+
         # Populate default attributes.
         bug['id'] = full_id
         bug['title'] = title
-        bug['entered'] = datetime.now().astimezone().isoformat()
+        bug['entered'] = datetime.fromtimestamp(now / 1e9).astimezone().isoformat()
         bug['author'] = self.user
         bug['open'] = True
 
@@ -380,7 +443,7 @@ class Tracker:
 
         self._write(bug)
 
-        prefix = self.prefixes()[full_id]
+        prefix = self._unique_prefix(full_id, existing)
         short_task_id = "[bold cyan]%s[/]:[yellow]%s[/]" % (prefix, full_id[len(prefix):])
         print(f"Added bug {short_task_id}")
 
@@ -398,9 +461,17 @@ class Tracker:
         """
         bug = self._get_bug(prefix)
         if title.startswith('s/') or title.startswith('/'):
-            title = re.sub('^s?/', '', title).rstrip('/')
+            title = title[2:] if title.startswith('s/') else title[1:]
+            title = title.rstrip('/')
             find, _, repl = title.partition('/')
-            title = re.sub(find, repl, bug['title'])
+            try:
+                pattern = re.compile(find)
+            except re.error as error:
+                raise exceptions.InvalidInput(f'"{find}" is not a valid regular expression: {error}') from error
+            try:
+                title = pattern.sub(repl, bug['title'])
+            except (re.error, IndexError) as error:
+                raise exceptions.InvalidInput(f'"{repl}" is not a valid replacement: {error}') from error
 
         bug['title'] = title
         self._write(bug)
@@ -432,8 +503,7 @@ class Tracker:
 # ----------------------------------------------------------------------------------------------------------------------
     def edit(self, prefix):
         """Allows the user to edit the details of the specified bug"""
-        bug = self._get_bug(prefix)
-        path = self._get_bug_path(bug['id'])
+        path = self._get_bug_path(self._resolve_id(prefix))
         self._launch_editor(path)
 
 
@@ -562,14 +632,13 @@ class Tracker:
 # ----------------------------------------------------------------------------------------------------------------------
     def list(self, scope='open', owner='*', grep='', sort='', descending=False):
         """Lists all bugs, applying the given filters"""
-        if not os.path.exists(self.bugsdir):
-            raise exceptions.NotInitialized('No bugs directory found - use `init` command first')
-
         prefixes = self.prefixes()
 
         if owner != '*':
             owner = self._get_user(owner)
 
+        pattern = grep.lower()
+
         filtered = []
         for bug in self._all_bugs():
             if scope == 'open' and not bug['open']:
@@ -578,21 +647,21 @@ class Tracker:
                 continue
             if owner != '*' and owner != bug.get('owner'):
                 continue
-            if grep != '' and grep.lower() not in bug['title'].lower():
+            if pattern and pattern not in bug['title'].lower():
                 continue
             filtered.append(bug)
 
         # Sort by title, alphabetically when the `-t` switch is provided.
         if sort == 'title':
-            filtered = sorted(filtered, key=lambda x: x.get('title', '').lower())
+            filtered.sort(key=lambda x: x.get('title', '').lower())
 
         # Sort by entered date when the `-e` switch is provided (note: mutually exclusive with `-t` alpha switch).
         elif sort == 'entered':
-            filtered = sorted(filtered, key=lambda bug: bug.get('entered'))
+            filtered.sort(key=lambda bug: bug.get('entered'))
 
         # Invert the list when the `-d` descending switch is provided.
         if descending:
-            filtered = list(reversed(filtered))
+            filtered.reverse()
 
         # Generate a table listing each of the bugs.
         table = Table(box=box.SIMPLE)
@@ -612,20 +681,24 @@ class Tracker:
             print('[i]{title}[/i]')
 
         # Generate a summary string.
-        summary = f'Found {len(filtered)} '
-        summary += f'{scope} ' if scope != 'all' else ''
-        summary += f"bug{'' if len(filtered) == 1 else 's'}"
+        summary = [f'Found {len(filtered)}']
+        if scope != 'all':
+            summary.append(scope)
+        summary.append(f"bug{'' if len(filtered) == 1 else 's'}")
         if owner != '*':
-            summary += f" owned by {'Nobody' if owner == '' else owner}"
+            summary.append(f"owned by {'Nobody' if owner == '' else owner}")
         if grep:
-            summary += f' whose title contains {grep}'
-        print(summary)
+            summary.append(f'whose title contains {grep}')
+        print(' '.join(summary))
 
 
 
 # ----------------------------------------------------------------------------------------------------------------------
     def verify(self) -> None:
         """Verify that each individual bugs file in the bugs folder matches the JSON schema and print any errors."""
+        # jsonschema is slow to import and only needed here, keep it off the startup path of every other command.
+        import jsonschema
+
         schema_file = os.path.join(os.path.dirname(__file__), 'schema', 'bug.schema.json')
         self.logger.info('Verifying bug files against schema %s', schema_file)
         with open(schema_file) as handle:
@@ -662,7 +735,7 @@ class Tracker:
 # ----------------------------------------------------------------------------------------------------------------------
     def migrate(self) -> None:
         """Migrate the current bugs directory to the latest version."""
-        migrations.details_to_markdown(self.bugsdir)
+        migrations.details_txt_to_yaml(self.bugsdir)
         migrations.details_to_yaml(self.bugsdir)
         migrations.move_details_to_bugs_root(self.bugsdir)
         migrations.bug_dict_into_yaml_details(self.bugsdir)
@@ -13,7 +13,6 @@
 # ----------------------------------------------------------------------------------------------------------------------
 import os
 import logging
-from importlib import metadata
 
 import click
 from rich import print
@@ -27,12 +26,30 @@ from b.templates import templates
 
 
 
+# ======================================================================================================================
+# Constants
+# ----------------------------------------------------------------------------------------------------------------------
+# Commands which never need to locate the bugs directory.
+TRACKERLESS = ('config', 'version')
+
+# Commands which need neither the settings nor the tracker - loading the context is skipped entirely for these.
+CONTEXTLESS = ('version',)
+
+
+
+
 # ======================================================================================================================
 # Helpers
 # ----------------------------------------------------------------------------------------------------------------------
 def load_context(ctx: click.Context):
     ctx.ensure_object(dict)
-    ctx.obj['settings'] = Settings()
+
+    # Only load once - click calls `get_command` repeatedly, once per command when rendering help for instance.
+    if 'settings' in ctx.obj:
+        return
+
+    # Settings are written back, only if changed, when the context is torn down at the end of the command.
+    ctx.obj['settings'] = ctx.with_resource(Settings())
     ctx.obj['tracker'] = Tracker(
         ctx.obj['settings'].get('dir'),
         ctx.obj['settings'].get('user'),
@@ -48,7 +65,8 @@ def load_context(ctx: click.Context):
 class AliasedGroup(click.Group):
     def get_command(self, ctx: click.Context, cmd_name: str):
         # These "settings" and "tracker" objects in the context will be shared with all of the commands/subcommands.
-        load_context(ctx)
+        if cmd_name not in CONTEXTLESS:
+            load_context(ctx)
 
         # Check if the command matches any of the registered commands first.
         rv = super().get_command(ctx, cmd_name)
@@ -56,7 +74,8 @@ class AliasedGroup(click.Group):
             return rv
 
         # When no command was matched, assume the "command" is a prefix and try to show `details` for it.
-        prefixes = [x for x in ctx.obj['tracker'].prefixes().values() if x.startswith(cmd_name)]
+        # Match against the full IDs so that typing more characters than the unique prefix still finds the bug.
+        prefixes = [prefix for id, prefix in ctx.obj['tracker'].prefixes().items() if id.startswith(cmd_name)]
         if not prefixes:
             # Can't do anything when there are no matches.
             return None
@@ -93,9 +112,10 @@ def cli(ctx: click.Context, verbose: int):
     if ctx.invoked_subcommand is None:
         load_context(ctx)
 
-    # Check for old versions and suggest migration.
-    if os.path.exists(os.path.join(ctx.obj['tracker'].bugsdir, 'bugs')):
-        logging.warning('It looks like the bugs directory is out of date - please run the `migrate` command')
+    # Check for old versions and suggest migration - skipped for commands that never look at the bugs directory.
+    if ctx.invoked_subcommand not in TRACKERLESS:
+        if os.path.exists(os.path.join(ctx.obj['tracker'].bugsdir, 'bugs')):
+            logging.warning('It looks like the bugs directory is out of date - please run the `migrate` command')
 
     # Run list command with default settings if no command was issued.
     if ctx.invoked_subcommand is None:
@@ -283,6 +303,8 @@ def migrate(ctx: click.Context):
 @cli.command()
 def version():
     """Output the version information and exit."""
+    # Deferred as importlib.metadata is costly to import and this is the only command that needs it.
+    from importlib import metadata
     version = metadata.version('b-bugtracker')
     print(f'b version {version}')
 
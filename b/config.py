@@ -37,17 +37,17 @@ def unset(ctx: click.Context, key):
     To list the current settings, issue the "config list" command.
     """
     ctx.obj['settings'].unset(key)
-    ctx.obj['settings'].store()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 @config.command()
+@click.argument('key')
+@click.argument('value')
 @click.pass_context
 def set(ctx: click.Context, key: str, value: str):
     """Set the setting identified by KEY to the provided VALUE."""
     ctx.obj['settings'].set(key, value)
     print(f'"{key}" set to "{value}"')
-    ctx.obj['settings'].store()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
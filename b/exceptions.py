@@ -15,7 +15,7 @@ class Error(Exception):
     """Base class for exceptions in this module."""
 
     def __init__(self, msg):
-        super(Error, self).__init__(msg)
+        super().__init__(msg)
         self.msg = msg
 
 
@@ -74,7 +74,7 @@ class UnknownCommand(Error):
     """Raised when trying to run an unknown command."""
 
     def __init__(self, cmd):
-        super(UnknownCommand, self).__init__("No such command '%s'" % cmd)
+        super().__init__("No such command '%s'" % cmd)
         self.cmd = cmd
 
 
@@ -83,7 +83,7 @@ class InvalidCommand(Error):
     """Raised when command invocation is invalid, e.g. incorrect options."""
 
     def __init__(self, reason):
-        super(InvalidCommand, self).__init__("Invalid command: %s" % reason)
+        super().__init__("Invalid command: %s" % reason)
         self.reason = reason
 
 
@@ -94,7 +94,7 @@ class InvalidInput(Error):
     """
 
     def __init__(self, reason):
-        super(InvalidInput, self).__init__("Invalid input: %s" % reason)
+        super().__init__("Invalid input: %s" % reason)
         self.reason = reason
 
 
@@ -103,6 +103,16 @@ class TemplateError(Error):
     """Raised when the specified template does not exist."""
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+class EditorError(Error):
+    """Raised when the configured editor could not be launched."""
+
+    def __init__(self, editor):
+        super().__init__("The editor - %s - could not be launched. Use `b config set editor` to choose another."
+            % editor)
+        self.editor = editor
+
+
 
 
 # End of File
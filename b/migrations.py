@@ -13,41 +13,122 @@
 # ----------------------------------------------------------------------------------------------------------------------
 import os
 import re
-import shutil
 import logging
 from glob import glob
 from datetime import datetime
 
 import yaml
 
+from b import presenters  # Registers the multiline string presenter used for every bug file written.
+
+
+
+
+# ======================================================================================================================
+# Constants
+# ----------------------------------------------------------------------------------------------------------------------
+# Matches each `label: value` pair in the metadata following the final "|" of a line in the legacy bugs dictionary.
+_META_RE = re.compile(r'\s*([^:,]+?)\s*:\s*([^,]*?)\s*(?:,|$)')
+
+# Matches a `[box style]` section header from the original .txt details files.
+_HEADER_RE = re.compile(r'^\[(.+)\]$', re.MULTILINE)
+
+# Splits the Markdown details files into chunks at the start of each line beginning with "##".
+_SECTION_SPLIT_RE = re.compile(r'^(?=##)', re.MULTILINE)
+
+# Matches the `## Heading` at the start of each of the chunks produced by `_SECTION_SPLIT_RE`.
+_HEADING_RE = re.compile(r'##+ +(.+?)$', re.MULTILINE)
+
+# Matches the author, date, and text of each comment within the comments section of the Markdown details files.
+_COMMENT_RE = re.compile(r'---+\[ *(.+?) +on +(.+?) *\]-+\n(.+?)(?:\n-|\Z)', re.DOTALL)
+
+# Use the libyaml backed dumper when PyYAML was built with it - it is much quicker when migrating many files.
+_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+
+
+# ======================================================================================================================
+# Helpers
+# ----------------------------------------------------------------------------------------------------------------------
+def _markdown_header(match: re.Match) -> str:
+    """Substitution for `_HEADER_RE` that turns a `[box style]` header into a `## Markdown Style` one."""
+    return '## ' + match.group(1).title()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def _sections(contents: str):
+    """Yield the title and content of each `## Heading` section in the provided Markdown."""
+    for chunk in _SECTION_SPLIT_RE.split(contents):
+        match = _HEADING_RE.match(chunk)
+        if match:
+            yield match.group(1), chunk[match.end():]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def _markdown_to_bug(contents: str) -> dict:
+    """Parse the sections of a Markdown details file into a dictionary ready to be dumped to YAML."""
+    data = {
+        'type': 'Bug'
+    }
+    for title, content in _sections(contents):
+        title = title.lower().replace(' ', '_')
+        if title != 'comments':
+            data[title] = content.strip()
+
+            if title == 'why':
+                data['type'] = 'Feature'
+        else:
+            comments = []
+            for author, date, text in _COMMENT_RE.findall(content):
+                comments.append({
+                    'author': author,
+                    'date': date,
+                    'text': text
+                })
+            if comments:
+                data['comments'] = comments
+    return data
+
 
 
 
 # ======================================================================================================================
 # Migrations
 # ----------------------------------------------------------------------------------------------------------------------
-def details_to_markdown(bugsdir: str):
-    """Migrate the details files from .txt format to .md format and swap the headers inside each."""
-    logging.info('Performing migration from .txt format detail files to .md format.')
-    for txt_path in glob(os.path.join(bugsdir, 'details', '*.txt')):
-        logging.info('Migrating %s from .txt to .md', txt_path)
-        md_path = os.path.splitext(txt_path)[0] + '.md'
-        with open(txt_path, 'r') as handle:
-            contents = handle.read()
+def details_txt_to_yaml(bugsdir: str):
+    """Migrate the details files from .txt format straight to YAML format.
+
+    Each file is converted in memory, so it is only read and written once with no intermediate file left on disc.
+    """
+    logging.info('Performing migration from .txt format detail files to .yaml format.')
+    details = os.path.join(bugsdir, 'details')
+    if not os.path.isdir(details):
+        return
 
-        # Change the headers inside of the files from [box style] to `## Markdown Style`.
-        def replace(match) -> str:
-            return '## ' + match.group(1).title()
-        contents = re.sub(r'^\[(.+)\]$', replace, contents, flags=re.MULTILINE)
+    with os.scandir(details) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.txt'):
+                continue
+            txt_path = entry.path
+            logging.info('Migrating %s from .txt to .yaml', txt_path)
+            yaml_path = txt_path[:-len('.txt')] + '.bug.yaml'
+            if os.path.exists(yaml_path):
+                logging.error('YAML already exists at %s', yaml_path)
+                continue
+            with open(txt_path, 'r') as handle:
+                contents = handle.read()
 
-        # Remove the original .txt file.
-        logging.debug('Deleting file %s', txt_path)
-        os.remove(txt_path)
+            # Swap the [box style] headers for Markdown ones and then parse those sections just as for .md files.
+            data = _markdown_to_bug(_HEADER_RE.sub(_markdown_header, contents))
 
-        # Write Markdown to new filename.
-        logging.debug('Writing contents to new file: %s', md_path)
-        with open(md_path, 'w') as handle:
-            handle.write(contents)
+            logging.debug('Writing YAML contents to %s', yaml_path)
+            with open(yaml_path, 'w') as handle:
+                yaml.dump(data, handle, Dumper=_DUMPER, sort_keys=False)
+
+            # Remove the original .txt file.
+            logging.debug('Deleting file %s', txt_path)
+            os.remove(txt_path)
 
 
 
@@ -58,48 +139,22 @@ def details_to_yaml(bugsdir: str):
     The section headings become keys and the section content becomes string values.
     """
     logging.info('Performing migration from .md format detail files to .yaml format.')
-    for md_path in glob(os.path.join(bugsdir, 'details', '*.md')):
+    details = os.path.join(bugsdir, 'details')
+    for md_path in glob(os.path.join(details, '*.md')):
         # logging.info('Migrating %s from .md to .yaml', md_path)
-        with open(md_path, 'r') as handle:
-            contents = handle.read()
-
-        # Parse sections into dict.
-        data = {
-            'type': 'Bug'
-        }
-        for title, content in re.findall(r'^##+ +(.+?)$(.*?)(?=^##|\Z)', contents, re.MULTILINE | re.DOTALL):
-            title = title.lower().replace(' ', '_')
-            if title != 'comments':
-                data[title] = content.strip()
-
-                if title == 'why':
-                    data['type'] = 'Feature'
-            else:
-                comments = []
-                pattern = r'---+\[ *(.+?) +on +(.+?) *\]-+\n(.+?)(?:\n-|\Z)'
-                for author, date, text in re.findall(pattern, content, re.DOTALL):
-                    comments.append({
-                        'author': author,
-                        'date': date,
-                        'text': text
-                    })
-                if comments:
-                    data['comments'] = comments
-
-        def str_presenter(dumper, data):
-            if len(data.splitlines()) > 1:  # check for multiline string
-                return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
-            return dumper.represent_scalar('tag:yaml.org,2002:str', data)
-        yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
-
-        # Write YAML to new filename.
-        yaml_path = os.path.splitext(md_path)[0] + '.bug.yaml'
+        # Skip files that have already been converted before doing any of the work to parse them.
+        yaml_path = md_path[:-len('.md')] + '.bug.yaml'
         if os.path.exists(yaml_path):
             logging.error('YAML already exists at %s', yaml_path)
             continue
+
+        with open(md_path, 'r') as handle:
+            data = _markdown_to_bug(handle.read())
+
+        # Write YAML to new filename.
         logging.debug('Writing YAML contents to %s', yaml_path)
         with open(yaml_path, 'w') as handle:
-            yaml.safe_dump(data, handle, sort_keys=False)
+            yaml.dump(data, handle, Dumper=_DUMPER, sort_keys=False)
 
         # Remove the original .md file.
         logging.debug('Deleting original .md file: %s', md_path)
@@ -113,12 +168,24 @@ def move_details_to_bugs_root(bugsdir: str):
     logging.info('Migrating details into .bugs root directory.')
     source = os.path.join(bugsdir, 'details')
     if os.path.exists(source):
-        for filename in os.listdir(source):
-            logging.debug('Moving %s from %s to %s', filename, source, bugsdir)
-            shutil.move(os.path.join(source, filename), bugsdir)
-
-        logging.debug('Removing "details" directory.')
-        os.rmdir(source)
+        # Both directories are on the same filesystem so a plain rename is all that is needed.
+        skipped = False
+        with os.scandir(source) as entries:
+            for entry in entries:
+                destination = os.path.join(bugsdir, entry.name)
+                # Never clobber a file already in the root - leave the detail file where it is for the user to merge.
+                if os.path.exists(destination):
+                    logging.error('%s already exists, leaving %s in place', destination, entry.path)
+                    skipped = True
+                    continue
+                logging.debug('Moving %s from %s to %s', entry.name, source, bugsdir)
+                os.replace(entry.path, destination)
+
+        if skipped:
+            logging.error('Not all details could be moved - the "details" directory has been left at %s', source)
+        else:
+            logging.debug('Removing "details" directory.')
+            os.rmdir(source)
 
 
 
@@ -127,34 +194,27 @@ def bug_dict_into_yaml_details(bugsdir: str):
     """Migrate the details from the dugs dictionary file into the individual bugs YAML files."""
     logging.info('Migrating details from bugs dictionary into individual YAML files.')
     bugs_filename = os.path.join(bugsdir, 'bugs')
-    if not os.path.exists(bugs_filename):
-        logging.debug('No bugs dictionary file found, nothing to do.')
-        return
 
     # Read out bug info from dictionary file.
-    with open(bugs_filename, 'r') as handle:
-        lines = handle.readlines()
+    try:
+        with open(bugs_filename, 'r') as handle:
+            lines = handle.readlines()
+    except FileNotFoundError:
+        logging.debug('No bugs dictionary file found, nothing to do.')
+        return
     bugs = []
     for line in lines:
         meta = {}
-        if '|' in line:
-            title, other = line.rsplit('|', 1)
-            meta['title'] = title.strip()
-            for piece in other.strip().split(','):
-                label, data = piece.split(':', 1)
-                meta[label.strip()] = data.strip()
+        # Metadata follows the final "|" - titles may contain pipes of their own.
+        pipe = line.rfind('|')
+        if pipe >= 0:
+            meta['title'] = line[:pipe].strip()
+            meta.update(_META_RE.findall(line[pipe + 1:].strip()))
         else:
             meta['title'] = line.strip()
         bugs.append(meta)
     logging.debug('Found %d bugs in the dictionary.', len(bugs))
 
-    # Handling for multiline strings.
-    def str_presenter(dumper, data):
-        if len(data.splitlines()) > 1:  # check for multiline string
-            return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
-        return dumper.represent_scalar('tag:yaml.org,2002:str', data)
-    yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
-
     # Write bugs into YAML files.
     for bug in bugs:
         # The YAML filename contains the ID, lets not duplicate it inside the file.
@@ -175,16 +235,16 @@ def bug_dict_into_yaml_details(bugsdir: str):
 
         # Merge with existing, if details YAML exists.
         yaml_file = os.path.join(bugsdir, id + '.bug.yaml')
-        if os.path.exists(yaml_file):
-            logging.debug('Updating %s with data from dictionary.', yaml_file)
+        try:
             with open(yaml_file, 'r') as handle:
+                logging.debug('Updating %s with data from dictionary.', yaml_file)
                 bug.update(yaml.safe_load(handle))
-        else:
+        except FileNotFoundError:
             logging.debug('Creating new YAML file for bug %s', id)
 
         # Write aggregated output to YAML file.
         with open(yaml_file, 'w') as handle:
-            yaml.safe_dump(bug, handle, sort_keys=False)
+            yaml.dump(bug, handle, Dumper=_DUMPER, sort_keys=False)
 
     logging.debug('Merge complete - removing now obsolete dictionary file.')
     os.remove(bugs_filename)
@@ -0,0 +1,36 @@
+# ======================================================================================================================
+#        File:  presenters.py
+#     Project:  B Bug Tracker
+# Description:  Simple bug tracker
+#      Author:  Jared Julien <jaredjulien@exsystems.net>
+#   Copyright:  (c) 2022-2023 Jared Julien <jaredjulien@exsystems.net>
+# ---------------------------------------------------------------------------------------------------------------------
+"""YAML presenters used when writing bug files.
+
+Importing this module registers the presenters with PyYAML's safe representer.
+"""
+
+# ======================================================================================================================
+# Imports
+# ----------------------------------------------------------------------------------------------------------------------
+import yaml
+
+
+
+
+# ======================================================================================================================
+# Presenters
+# ----------------------------------------------------------------------------------------------------------------------
+def str_presenter(dumper, data):
+    """Represent multiline strings as YAML literal blocks."""
+    if len(data.splitlines()) > 1:  # check for multiline string
+        return dumper.represent_scalar('tag:yaml.org,2002:str', data, style='|')
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data)
+
+
+yaml.representer.SafeRepresenter.add_representer(str, str_presenter)
+
+
+
+
+# End of File
@@ -40,10 +40,13 @@ class Settings:
         self.path = appdirs.user_data_dir('b', 'exsystems', roaming=True)
         self.file = os.path.join(self.path, 'settings.cfg')
         self.config = ConfigParser()
+        self._dirty = False
+        # Defaults are factories so that the costlier ones (looking up the login name) only run when a setting hasn't
+        # been configured by the user.
         self.defaults = {
-            'general.editor': 'notepad' if os.name == 'nt' else 'nano',
-            'general.dir': '.bugs',
-            'general.user': getpass.getuser()
+            'general.editor': lambda: 'notepad' if os.name == 'nt' else 'nano',
+            'general.dir': lambda: '.bugs',
+            'general.user': getpass.getuser
         }
         self.load()
 
@@ -61,7 +64,9 @@ class Settings:
 
 # ----------------------------------------------------------------------------------------------------------------------
     def __exit__(self, type, value, traceback):
-        self.store()
+        # Only rewrite the config file when a setting was actually changed.
+        if self._dirty:
+            self.store()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -69,6 +74,8 @@ class Settings:
         if os.path.exists(self.file):
             with open(self.file, 'r') as handle:
                 self.config.read_file(handle)
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
         keys = list(self.defaults.keys())
         for section in self.config.sections():
             for option in self.config.options(section):
@@ -84,6 +91,7 @@ class Settings:
         os.makedirs(self.path, exist_ok=True)
         with open(self.file, 'w') as handle:
             self.config.write(handle)
+        self._dirty = False
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -113,6 +121,7 @@ class Settings:
             self.config.add_section(section)
 
         self.config.set(section, option, value)
+        self._dirty = True
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -122,13 +131,17 @@ class Settings:
         try:
             return self.config.get(section, option)
         except (NoSectionError, NoOptionError):
-            return self.defaults[key]
+            return self.defaults[key]()
 
 
 # ----------------------------------------------------------------------------------------------------------------------
     def unset(self, key: str, section: str = 'settings') -> bool:
         section, option = self._split_key(key)
-        return self.config.remove_option(section, option)
+        if not self.config.has_section(section):
+            return False
+        removed = self.config.remove_option(section, option)
+        self._dirty = self._dirty or removed
+        return removed
 
 
 # ----------------------------------------------------------------------------------------------------------------------
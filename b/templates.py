@@ -36,11 +36,16 @@ def list(ctx: click.Context, defaults: bool):
     """List the templates that are available to the `add` command."""
     print(f"Available {'default ' if defaults else ''}bug templates:")
     templates = ctx.obj['tracker'].list_templates(only_defaults=defaults)
+    root = os.path.dirname(ctx.obj['tracker'].bugsdir)
+    sep = os.path.sep.replace('\\', '\\\\')
+
+    # Templates only ever come from a couple of directories, resolve each relative path just once.
+    bases = {}
     for name in sorted(templates.keys()):
-        base = os.path.relpath(os.path.dirname(templates[name]), os.path.dirname(ctx.obj['tracker'].bugsdir))
-        filename = os.path.basename(templates[name])
-        sep = os.path.sep.replace('\\', '\\\\')
-        print(f'- [green]{name}[/] ([italic]{base}{sep}[yellow]{filename}[/])')
+        directory, filename = os.path.split(templates[name])
+        if directory not in bases:
+            bases[directory] = os.path.relpath(directory, root)
+        print(f'- [green]{name}[/] ([italic]{bases[directory]}{sep}[yellow]{filename}[/])')
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,110 @@
+# ======================================================================================================================
+#        File:  test_migrations.py
+#     Project:  B Bug Tracker
+# Description:  Distributed Bug Tracker
+#      Author:  Jared Julien <jaredjulien@exsystems.net>
+#   Copyright:  (c) 2022-2023 Jared Julien <jaredjulien@exsystems.net>
+# ---------------------------------------------------------------------------------------------------------------------
+"""Unit tests for parsing the legacy Markdown details files during migration.
+
+To execute:
+
+    poetry run pytest tests
+"""
+
+
+# ======================================================================================================================
+# Import Statements
+# ----------------------------------------------------------------------------------------------------------------------
+import random
+import re
+
+import pytest
+
+from b import migrations
+
+
+
+
+# ======================================================================================================================
+# Constants
+# ----------------------------------------------------------------------------------------------------------------------
+# The lookahead pattern that sections were originally found with.
+REFERENCE_RE = re.compile(r'^##+ +(.+?)$(.*?)(?=^##|\Z)', re.MULTILINE | re.DOTALL)
+
+DETAILS = """\
+## Details
+Something is broken.
+
+### Steps To Reproduce
+1. Run it
+2. Watch it fail
+
+## Comments
+---------------------[ jared on 2023-05-01 ]---------------------
+First comment
+-----------------------[ bob on 2023-05-02 ]----------------------
+Second comment
+"""
+
+
+
+
+# ======================================================================================================================
+# Tests
+# ----------------------------------------------------------------------------------------------------------------------
+def test_sections():
+    """Each heading, including deeper sub-headings, starts a new section running up to the next heading."""
+    assert list(migrations._sections(DETAILS)) == [
+        ('Details', '\nSomething is broken.\n\n'),
+        ('Steps To Reproduce', '\n1. Run it\n2. Watch it fail\n\n'),
+        ('Comments', '\n---------------------[ jared on 2023-05-01 ]---------------------\nFirst comment\n'
+                     '-----------------------[ bob on 2023-05-02 ]----------------------\nSecond comment\n')
+    ]
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_sections_ignores_preamble():
+    """Text before the first heading, and lines starting with "##" that aren't headings, belong to no section."""
+    assert list(migrations._sections('preamble\n##not a heading\n## Title\ntext')) == [('Title', '\ntext')]
+    assert list(migrations._sections('')) == []
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_markdown_to_bug():
+    """Sections become lowercase keys with comments parsed into a list."""
+    assert migrations._markdown_to_bug(DETAILS) == {
+        'type': 'Bug',
+        'details': 'Something is broken.',
+        'steps_to_reproduce': '1. Run it\n2. Watch it fail',
+        'comments': [
+            {'author': 'jared', 'date': '2023-05-01', 'text': 'First comment'},
+            {'author': 'bob', 'date': '2023-05-02', 'text': 'Second comment\n'}
+        ]
+    }
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_markdown_to_bug_feature():
+    """A "why" section marks the bug as a feature."""
+    assert migrations._markdown_to_bug('## What\nthing\n## Why\nreason\n')['type'] == 'Feature'
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+@pytest.mark.parametrize('seed', range(20))
+def test_sections_match_reference(seed):
+    """Splitting at the headings finds the same sections as the original lookahead pattern."""
+    rng = random.Random(seed)
+    lines = ['## A', '### Sub b', '##x', 'text', '', '- item', '#', '## t ## u', '  ## no']
+    for _ in range(200):
+        contents = '\n'.join(rng.choice(lines) for _ in range(rng.randint(0, 8)))
+        assert list(migrations._sections(contents)) == REFERENCE_RE.findall(contents)
+
+
+
+
+# End of File
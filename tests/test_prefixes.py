@@ -0,0 +1,113 @@
+# ======================================================================================================================
+#        File:  test_prefixes.py
+#     Project:  B Bug Tracker
+# Description:  Distributed Bug Tracker
+#      Author:  Jared Julien <jaredjulien@exsystems.net>
+#   Copyright:  (c) 2022-2023 Jared Julien <jaredjulien@exsystems.net>
+# ---------------------------------------------------------------------------------------------------------------------
+"""Unit tests for the unique prefixes computed by the Tracker.
+
+To execute:
+
+    poetry run pytest tests
+"""
+
+
+# ======================================================================================================================
+# Import Statements
+# ----------------------------------------------------------------------------------------------------------------------
+import random
+
+import pytest
+
+from b.bugs import Tracker
+
+
+
+
+# ======================================================================================================================
+# Helpers
+# ----------------------------------------------------------------------------------------------------------------------
+def reference_prefixes(ids):
+    """The original algorithm - the shortest prefix of each ID which is not also a prefix of any other ID."""
+    prefixes = {}
+    for id in ids:
+        others = [other for other in ids if other != id]
+        length = 1
+        while any(other.startswith(id[:length]) for other in others):
+            length += 1
+        prefixes[id] = id[:length]
+    return prefixes
+
+
+
+
+# ======================================================================================================================
+# Fixtures
+# ----------------------------------------------------------------------------------------------------------------------
+@pytest.fixture
+def make_tracker(tmp_path):
+    """Create a Tracker whose bugs directory contains an empty bug file for each of the provided IDs."""
+    def make(ids):
+        for id in ids:
+            (tmp_path / f'{id}.bug.yaml').touch()
+        return Tracker(str(tmp_path), 'me', 'true')
+    return make
+
+
+
+
+# ======================================================================================================================
+# Tests
+# ----------------------------------------------------------------------------------------------------------------------
+def test_single_id(make_tracker):
+    """A lone bug is identified by its first character."""
+    assert make_tracker(['a94a8fe5cc']).prefixes() == {'a94a8fe5cc': 'a'}
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_distinct_first_characters(make_tracker):
+    """IDs which differ in the first character only need that character."""
+    tracker = make_tracker(['a94a8fe5cc', 'deea8c528c', '4ab23f0e1d'])
+    assert tracker.prefixes() == {'a94a8fe5cc': 'a', 'deea8c528c': 'd', '4ab23f0e1d': '4'}
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_collision_extends_prefix(make_tracker):
+    """IDs sharing leading characters are extended one past their longest common prefix with any neighbor."""
+    tracker = make_tracker(['abc123', 'abd456', 'abd789', 'b00000'])
+    assert tracker.prefixes() == {'abc123': 'abc', 'abd456': 'abd4', 'abd789': 'abd7', 'b00000': 'b'}
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_no_bugs(make_tracker):
+    """An empty bugs directory has no prefixes."""
+    assert make_tracker([]).prefixes() == {}
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+def test_unique_prefix():
+    """The prefix for a single ID is only as long as needed to distinguish it from each of the others."""
+    assert Tracker._unique_prefix('abcdef', []) == 'a'
+    assert Tracker._unique_prefix('abcdef', ['abzzzz', 'bbbbbb']) == 'abc'
+    assert Tracker._unique_prefix('abcdef', ['bbbbbb', 'abcdzz']) == 'abcde'
+
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_reference(make_tracker, seed):
+    """The sorted neighbor approach agrees with comparing every ID against every other."""
+    rng = random.Random(seed)
+    # Short IDs from a small alphabet produce plenty of long shared prefixes.
+    ids = list({''.join(rng.choice('0123') for _ in range(8)) for _ in range(rng.randint(1, 60))})
+    assert make_tracker(ids).prefixes() == reference_prefixes(ids)
+
+
+
+
+# End of File